@@ -3,6 +3,7 @@ import os
 import platform
 import subprocess
 import beets
+import confuse
 import optparse
 import glob
 import urllib
@@ -44,6 +45,7 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
 
         # Set defaults (dependent on current os)
         self._possible_formats = [ u'posix', u'ntfs', u'uriposix', u'urintfs' ]
+        self._mounted_drives = None
         self._default_source_dir = { 'Linux': u'posix', 'Windows': u'ntfs' }.get( platform.system(), u'posix' )
         self._default_playlist_path = pathlib.Path( beets.config['playlist']['playlist_dir'].as_filename() ).resolve()
         if self._default_source_dir == u'posix':
@@ -67,7 +69,8 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
             'playlist_posix': str( self._default_playlist_posix ),
             'playlist_ntfs': str( self._default_playlist_ntfs ),
             'playlist_uriposix': str( self._default_playlist_uriposix ),
-            'playlist_urintfs': str( self._default_playlist_urintfs )
+            'playlist_urintfs': str( self._default_playlist_urintfs ),
+            'profiles': {}
         })
 
         # Create commandline parser
@@ -86,6 +89,7 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
         self._parser_export = optparse.OptionGroup( self._parser, u'Export', u'Use this to export one or more playlists to defined formats' )
         self._parser_export.add_option( u'-e', u'--export', dest='do_export', action='store_true', help=u'Export playlists to specified formats', default=False )
         self._parser_export.add_option( u'-t', u'--types', dest='types', action='store', type='list', help=u'Define types to export to. Multiple values accepted, seperate with ","' )
+        self._parser_export.add_option( u'-r', u'--profiles', dest='profiles', action='store', type='list', help=u'Define configured export profiles to export to. Multiple values accepted, seperate with ","' )
 
         # Add groups to parser
         self._parser.add_option_group( self._parser_import )
@@ -156,6 +160,9 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
     # Function to import a playlist
     def do_import ( self, opts ):
 
+        # Look up the mounted drives once for this run
+        self._mounted_drives = None
+
         # Loop through given filepaths
         for index, filepath in enumerate( opts.filepath ):
 
@@ -184,12 +191,13 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
                     else:
                         new_filename = opts.filename[index] + '.m3u'
 
-                    new_filepath = {
-                        self.config['source_dir'].as_str(): pathlib.PurePath( self.config[ 'playlist_' + self.config['source_dir'].as_str() ].as_filename(), new_filename )
+                    new_filepath = pathlib.PurePath( self.config[ 'playlist_' + self.config['source_dir'].as_str() ].as_filename(), new_filename )
+                    profiles = {
+                        self.config['source_dir'].as_str(): self.make_profile( self.config['source_dir'].as_str(), new_filepath )
                     }
 
                     # Convert file
-                    self.convert_playlist( p, new_filepath, [ self.config['source_dir'].as_str() ], known_source=False, show_diff=opts.show_changes, append=opts.append )
+                    self.convert_playlist( p, profiles, known_source=False, show_diff=opts.show_changes, append=opts.append )
 
             except FileNotFoundError:
                 print( beets.ui.colorize( 'text_error', u'The filepath could not be found for: {}'.format( filepath ) ) )
@@ -197,31 +205,58 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
     # Function to export a playlist
     def do_export ( self, opts ):
 
+            # Look up the mounted drives once for this run
+            self._mounted_drives = None
+
             # Check if no filename has been defined
             if opts.filename is None:
                 opts.filename = [ self.config[ 'playlist_' + self.config['source_dir'].as_str() ].as_filename() ]
             self._log.debug( u'The following filenames have been passed: {0}', opts.filename )
 
-            # Check if no types have been defined
-            if opts.types is None:
-                opts.types = self.config['types'].as_str_seq( True )
-            self._log.debug( u'The following types have been passed: {0}', opts.types )
+            # Use all configured profiles if neither profiles, types nor paths have been defined
+            try:
+                configured_profiles = self.config['profiles'].get( dict )
+            except confuse.ConfigError as error:
+                raise beets.ui.UserError( u'Profiles are invalid: {0}'.format( error ) )
+            if opts.profiles is None and opts.types is None and opts.filepath is None and configured_profiles:
+                opts.profiles = list( configured_profiles.keys() )
+
+            # Check if profiles have been chosen
+            if opts.profiles is not None:
+                if opts.types is not None or opts.filepath is not None:
+                    raise beets.ui.UserError( u'Cannot combine profiles with types or filepaths. Define either profiles or types / filepaths' )
+                self._log.debug( u'The following profiles have been passed: {0}', opts.profiles )
+                profiles = self.get_profiles( opts.profiles )
 
-            # Check if no path has been defined
-            new_filepath = dict()
-            if opts.filepath is None:
-                for t in opts.types:
-                    new_filepath[t] = self.config[ 'playlist_' + t ].as_str()
             else:
-                for index, t in enumerate( opts.types ):
-                    new_filepath[t] = opts.filepath[index]
-            opts.filepath = new_filepath
-            self._log.debug( u'The following filepaths have been passed: {0}', opts.filepath )
+                # Check if no types have been defined
+                if opts.types is None:
+                    opts.types = self.config['types'].as_str_seq( True )
+                self._log.debug( u'The following types have been passed: {0}', opts.types )
+
+                # Check if no path has been defined
+                new_filepath = dict()
+                if opts.filepath is None:
+                    for t in opts.types:
+                        new_filepath[t] = self.config[ 'playlist_' + t ].as_str()
+                else:
+                    for index, t in enumerate( opts.types ):
+                        new_filepath[t] = opts.filepath[index]
+                opts.filepath = new_filepath
+                self._log.debug( u'The following filepaths have been passed: {0}', opts.filepath )
+
+                # Create a profile for each type
+                profiles = dict()
+                for k, v in opts.filepath.items():
+                    profiles[k] = self.make_profile( k, v )
 
-            # Printing the selected types and there export paths
+            # Printing the selected profiles and there export paths
             print( u'Exporting playlists:' )
-            for k, v in opts.filepath.items():
-                print( u'"{0}" to "{1}"'.format( k, v ) )
+            for k, v in profiles.items():
+                if k == v['format']:
+                    print( u'"{0}" to "{1}"'.format( k, v['path'] ) )
+                else:
+                    print( u'"{0}" ({1}) to "{2}"'.format( k, v['format'], v['path'] ) )
 
             # Loop through given filenames
             for filename in opts.filename:
@@ -245,11 +280,77 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
                         print( beets.ui.colorize( 'text_highlight_minor', 'Exporting file {0}'.format( p ) ) )
 
                         # Convert file
-                        self.convert_playlist( p, opts.filepath, opts.types, known_source=True, show_diff=opts.show_changes, append=opts.append )
+                        self.convert_playlist( p, profiles, known_source=True, show_diff=opts.show_changes, append=opts.append )
 
                 except FileNotFoundError:
                     print( beets.ui.colorize( 'text_error', u'The filepath could not be found for file: {}'.format( filename ) ) )
 
+    # Function to create an export profile, returns dictionary
+    def make_profile ( self, dest_format, path, prefixes=None ):
+
+        return {
+            'format': dest_format,
+            'path': path,
+            'prefixes': list( ( prefixes or {} ).items() )
+        }
+
+    # Function to read the given profiles from the configuration, returns dictionary of profiles
+    def get_profiles ( self, names ):
+
+        # Configured profile keys by name, YAML may parse names as other types (e.g. numbers)
+        configured_names = { str( key ): key for key in self.config['profiles'].get( dict ) }
+
+        profiles = dict()
+        for name in names:
+            name = str( name ).strip( ' ,' )
+
+            # Check if the profile has been configured
+            if name not in configured_names:
+                raise beets.ui.UserError( u'No profile named "{0}" has been configured'.format( name ) )
+            profile_config = self.config['profiles'][configured_names[name]]
+
+            # Check if the profile defines a valid format and path
+            try:
+                dest_format = profile_config['format'].as_choice( self._possible_formats )
+                path = profile_config['path'].as_filename()
+                prefixes = profile_config['prefixes'].get( dict ) if profile_config['prefixes'].exists() else {}
+                for old_prefix, new_prefix in prefixes.items():
+                    if not isinstance( old_prefix, str ) or not isinstance( new_prefix, str ):
+                        raise beets.ui.UserError( u'Profile "{0}" is invalid: prefix mappings must be strings, got {1!r}: {2!r}'.format( name, old_prefix, new_prefix ) )
+            except confuse.ConfigError as error:
+                raise beets.ui.UserError( u'Profile "{0}" is invalid: {1}'.format( name, error ) )
+
+            profiles[name] = self.make_profile( dest_format, path, prefixes )
+
+        return profiles
+
+    # Function to replace the first matching prefix of a converted line
+    def remap_prefix ( self, line, prefixes, dest_format ):
+
+        # Prefixes only match whole path components, ntfs paths are case insensitive
+        separator = '\\' if dest_format == 'ntfs' else '/'
+        ignore_case = dest_format == 'ntfs'
+
+        for old_prefix, new_prefix in prefixes:
+
+            # Let both prefixes end in exactly one separator
+            if not old_prefix.endswith( separator ):
+                old_prefix = old_prefix + separator
+            if not new_prefix.endswith( separator ):
+                new_prefix = new_prefix + separator
+
+            if ignore_case:
+                compare_line, compare_prefix = line.lower(), old_prefix.lower()
+            else:
+                compare_line, compare_prefix = line, old_prefix
+
+            # Line starts with the prefix or is the prefix itself
+            if compare_line.startswith( compare_prefix ):
+                return new_prefix + line[len( old_prefix ):]
+            if compare_line == compare_prefix[:-1]:
+                return new_prefix[:-1]
+        return line
+
     # Function to check for updates
     def do_updatecheck ( self ):
 
@@ -282,22 +383,15 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
             raise( beets.ui.UserError( u'Whil checking for updates an error occurred' ) )
 
     # Function to convert a playlist
-    def convert_playlist ( self, playlist_read, playlist_write_assc, dest_formats, known_source, show_diff, append ):
-
-        # List of new playlist contents
-        converted_playlist_content = {
-            'posix': [],
-            'ntfs': [],
-            'uriposix': [],
-            'urintfs': []
-        }
-        playlist_content_diff = {
-            'posix': [],
-            'ntfs': [],
-            'uriposix': [],
-            'urintfs': []
-        }
-        self._log.debug( u'convert_playlist passed formats: {0}', dest_formats )
+    def convert_playlist ( self, playlist_read, profiles, known_source, show_diff, append ):
+
+        # List of new playlist contents, one per profile
+        converted_playlist_content = { name: [] for name in profiles }
+        playlist_content_diff = { name: [] for name in profiles }
+
+        # Distinct formats of all profiles, each line is only converted once per format
+        dest_formats = list( dict.fromkeys( profile['format'] for profile in profiles.values() ) )
+        self._log.debug( u'convert_playlist passed profiles: {0}, formats: {1}', list( profiles ), dest_formats )
         playlist_read = pathlib.PurePath( playlist_read )
 
         try:
@@ -311,46 +405,60 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
                     line = line.strip( '\r\n ' )
                     self._log.debug( 'File "{1}": Processing line: {0}', line, playlist_read.name )
 
+                    # Check if the line is a comment / extended m3u tag
+                    is_comment = line.startswith( '#' )
+                    if is_comment:
+                        self._log.debug( 'Comment found' )
+
                     # Convert line into each destination format
+                    converted_lines = dict()
                     for dest_format in dest_formats:
 
                         self._log.debug( 'Converting to: {0}', dest_format )
 
-                        # Check if the line is a comment / extended m3u tag
-                        if line.startswith( '#' ):
-                            self._log.debug( 'Comment found' )
-                            converted_playlist_content[dest_format].append( line )
+                        # Comments / extended m3u tags are kept as is
+                        if is_comment:
+                            converted_line = line
 
-                        # Else try to create the filepath and add it
+                        # If the source is known, convert without checking for file existence (aka while exporting)
+                        elif known_source:
+                            converted_line = self.convert_path( line, dest_format )
+
+                        # Otherwise check the created path for its existence (aka while importing)
                         else:
+                            converted_line = self.convert_pure_path( line, dest_format, True )
 
-                            # If the source is known, convert without checking for file existence (aka while exporting)
-                            if known_source:
-                                converted_line = self.convert_path( line, dest_format )
-                            
-                            # Otherwise check the created path for its existence (aka while importing)
-                            else:
-                                converted_line = self.convert_pure_path( line, dest_format, True )
+                        self._log.debug( 'Parsed line: {0}', converted_line )
+                        converted_lines[dest_format] = None if converted_line is None else str( converted_line )
 
-                            self._log.debug( 'Parsed line: {0}', converted_line )
+                    # Hand the converted line to each profile
+                    for name, profile in profiles.items():
 
-                            # Only add to content if not None
-                            if converted_line is not None:
-                                converted_playlist_content[dest_format].append( str( converted_line ) )
-                                playlist_content_diff[dest_format].append( ( line, str( converted_line ) ) )
+                        converted_line = converted_lines[profile['format']]
 
-            # Again loop through all destination formats to save the created files
-            for dest_format in dest_formats:
+                        # Only add to content if not None
+                        if converted_line is None:
+                            continue
+
+                        if is_comment:
+                            converted_playlist_content[name].append( converted_line )
+                        else:
+                            converted_line = self.remap_prefix( converted_line, profile['prefixes'], profile['format'] )
+                            converted_playlist_content[name].append( converted_line )
+                            playlist_content_diff[name].append( ( line, converted_line ) )
+
+            # Again loop through all profiles to save the created files
+            for name, profile in profiles.items():
 
                 # Check if there is any content to save (filtering out comments / extended m3u tags)
-                if len( fnmatch.filter( converted_playlist_content[dest_format], '#*' ) ) != len( converted_playlist_content[dest_format] ):
+                if len( fnmatch.filter( converted_playlist_content[name], '#*' ) ) != len( converted_playlist_content[name] ):
 
                     if show_diff:
                         # Show differences between files
-                        beets.ui.show_path_changes( playlist_content_diff[dest_format] )
+                        beets.ui.show_path_changes( playlist_content_diff[name] )
 
                     # Get current destination
-                    playlist_write = pathlib.Path( playlist_write_assc[dest_format] )
+                    playlist_write = pathlib.Path( profile['path'] )
 
                     # Check if a directory has been given to save files to
                     if playlist_write.suffix == '':
@@ -365,12 +473,12 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
                         current_content = playlist_write.read_text( encoding='utf-8' )
 
                         # Add new content to current content
-                        converted_playlist_content[dest_format] = [current_content] + converted_playlist_content[dest_format]
+                        converted_playlist_content[name] = [current_content] + converted_playlist_content[name]
 
                     # Create all folders and write to file
                     try:
                         playlist_write.parent.mkdir( parents=True, exist_ok=True )
-                        playlist_write.write_text( '\n'.join( converted_playlist_content[dest_format] ), encoding='utf-8' )
+                        playlist_write.write_text( '\n'.join( converted_playlist_content[name] ), encoding='utf-8' )
                     except OSError:
                         print( beets.ui.colorize( 'text_error', u'Error while saving the playlist to: {0}'.format( str( playlist_write ) ) ) )
 
@@ -537,6 +645,10 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
     # Function to get mounted drives, returns list of dictionaries
     def get_mounted_drives( self ):
 
+        # Return the drives already looked up during this run
+        if self._mounted_drives is not None:
+            return self._mounted_drives
+
         # Get mounted drives
         df_process = subprocess.run( ['df', '--type=drvfs', '--portability'], capture_output=True )
         if df_process.returncode != 0:
@@ -565,7 +677,8 @@ class PlayConvPlug ( beets.plugins.BeetsPlugin ):
             # Add dictionary to list
             mounted_drives.append( mounted_drive )
 
-        # Return list of dictionaries
+        # Remember and return list of dictionaries
+        self._mounted_drives = mounted_drives
         return mounted_drives
 
     #